@@ -1,111 +1,77 @@
-import os
-import requests
-import csv
-import json
-from dotenv import load_dotenv
-
-# Load environment variables from a .env file
-load_dotenv()  # Load API key from .env file
-API_KEY = os.getenv('API_KEY')  # Get the API key from the environment variables
-
-# Function to fetch nutrition data from USDA API
-def fetch_from_usda(food, quantity):
-    # Construct the search URL with the food query and API key
-    search_url = f"https://api.nal.usda.gov/fdc/v1/foods/search?query={food}&api_key={API_KEY}"
-    try:
-        # Make a GET request to the USDA API
-        response = requests.get(search_url)
-        # Raise an error if the request was unsuccessful
-        response.raise_for_status()
-        # Convert the response to JSON format
-        data = response.json()
-
-        # Check if any food items were found
-        if data.get('foods'):
-            food_data = data['foods'][0]  # Get the first food item found
-            # Extract nutrient information into a dictionary
-            nutrients = {nutrient['nutrientId']: nutrient['value'] for nutrient in food_data.get('foodNutrients', [])}
-
-            # Return calculated nutrition values based on the requested quantity
-            return {
-                "carbs": nutrients.get(1005, 0) / 100 * quantity,
-                "protein": nutrients.get(1003, 0) / 100 * quantity,
-                "fat": nutrients.get(1004, 0) / 100 * quantity,
-                "calories": nutrients.get(1008, 0) / 100 * quantity,
-                "fiber": nutrients.get(1079, 0) / 100 * quantity,
-                "quantity": quantity,
-                "food_description": food_data.get('description', 'N/A')  # Get food description or default to 'N/A'
-            }
-        print("No foods found in the USDA database.")  # Inform user if no food was found
-    except requests.RequestException as e:
-        print(f"Error fetching data: {e}")  # Print error message if there's an issue with the request
-
-    return None  # Return None if there was an error or no food was found
+# Heavier modules (csv, json, usda_client and its requests/dotenv imports) are
+# imported inside the functions that need them to keep CLI start-up fast.
+import argparse
+import sys
+try:
+    import readline  # Enables line editing and history for input() prompts
+except ImportError:
+    pass
+from macros_math import calculate_bmr, calculate_tdee, recommended_macros
+
+# Numeric fields summed when combining food items, in display order
+FIELDS = ("carbs", "protein", "fat", "calories", "fiber", "quantity")
+WRITE_BUFFER_SIZE = 1 << 16  # 64 KB buffer for result files
+
+# Sum macros across food items, skipping lookups that failed
+def combine_macros(macros_list):
+    rows = [[macros[key] for key in FIELDS] for macros in macros_list if macros]
+    totals = [sum(column) for column in zip(*rows)] if rows else [0] * len(FIELDS)
+    return dict(zip(FIELDS, totals))
+
+# Main menu, rendered once
+MENU = "\n".join([
+    "",
+    "--- Nutrition App Menu ---",
+    "1. Search for a single food item",
+    "2. Search for multiple food items and calculate combined macros",
+    "3. Save results to a file (CSV or JSON)",
+    "4. Enter personal details for recommended daily intake comparison",
+    "5. Exit",
+    ""
+])
 
 # Function to display the main menu options
 def display_menu():
-    menu_options = [
-        "1. Search for a single food item",
-        "2. Search for multiple food items and calculate combined macros",
-        "3. Save results to a file (CSV or JSON)",
-        "4. Enter personal details for recommended daily intake comparison",
-        "5. Exit"
-    ]
-    print("\n--- Nutrition App Menu ---")
-    print("\n".join(menu_options))  # Print menu options
+    sys.stdout.write(MENU)  # Print the whole menu in a single write
 
 # Function to save results in either CSV or JSON format
 def save_results(results):
+    import csv
+    import io
+    import json
+    try:
+        import orjson  # Faster JSON encoding when available
+    except ImportError:
+        orjson = None
+
     file_format = input("How would you like to save the file? (csv/json): ").lower()  # Get desired file format
     file_name = input("Enter the file name (without extension): ")  # Get file name from user
 
     try:
         # Save as CSV
         if file_format == 'csv':
-            with open(f"{file_name}.csv", mode='w', newline='') as file:
-                writer = csv.DictWriter(file, fieldnames=results[0].keys())  # Create a CSV writer
-                writer.writeheader()  # Write header row
-                writer.writerows(results)  # Write result rows
+            buffer = io.StringIO(newline='')  # Build the CSV in memory, then write it once
+            writer = csv.DictWriter(buffer, fieldnames=results[0].keys())  # Create a CSV writer
+            writer.writeheader()  # Write header row
+            writer.writerows(results)  # Write result rows
+            with open(f"{file_name}.csv", mode='w', newline='', buffering=WRITE_BUFFER_SIZE) as file:
+                file.write(buffer.getvalue())
             print(f"Results saved to {file_name}.csv")  # Inform user of successful save
         # Save as JSON
         elif file_format == 'json':
-            with open(f"{file_name}.json", mode='w') as file:
-                json.dump(results, file, indent=4)  # Write results to JSON file with indentation
+            if orjson:
+                with open(f"{file_name}.json", mode='wb', buffering=WRITE_BUFFER_SIZE) as file:
+                    file.write(orjson.dumps(results, option=orjson.OPT_INDENT_2))  # Write results to JSON file with indentation
+            else:
+                with open(f"{file_name}.json", mode='w', encoding='utf-8', buffering=WRITE_BUFFER_SIZE) as file:
+                    # Serialize once, matching orjson's output (2-space indent, raw UTF-8)
+                    file.write(json.dumps(results, indent=2, ensure_ascii=False))
             print(f"Results saved to {file_name}.json")  # Inform user of successful save
         else:
             print("Invalid format. Please try again.")  # Handle invalid format case
     except Exception as e:
         print(f"Error saving file: {e}")  # Print error message if there's an issue saving the file
 
-# Function to calculate Basal Metabolic Rate (BMR)
-def calculate_bmr(weight, height, age, gender):
-    return (
-        10 * weight + 6.25 * height - 5 * age + (5 if gender == 'male' else -161)  # BMR calculation formula
-    )
-
-# Function to calculate Total Daily Energy Expenditure (TDEE) based on activity level
-def calculate_tdee(bmr, activity_level):
-    # Define activity multipliers
-    activity_factors = {
-        'sedentary': 1.2,
-        'light': 1.375,
-        'moderate': 1.55,
-        'active': 1.725,
-        'very active': 1.9
-    }
-    return bmr * activity_factors.get(activity_level, 1.2)  # Return TDEE based on activity level
-
-# Function to calculate recommended macronutrient distribution based on TDEE
-def recommended_macros(tdee):
-    # Define macronutrient ratios
-    ratios = {
-        "carbs": (45, 65),
-        "protein": (10, 35),
-        "fat": (20, 35)
-    }
-    # Calculate recommended ranges for each nutrient
-    return {nutrient: [(tdee * percent / 4 if nutrient != 'fat' else tdee * percent / 9) for percent in ratio] for nutrient, ratio in ratios.items()}
-
 # Function to calculate recommended intake based on personal details
 def calculate_recommended_intake():
     try:
@@ -113,11 +79,11 @@ def calculate_recommended_intake():
         age = int(input("Enter your age: "))
         weight = float(input("Enter your weight (kg): "))
         height = float(input("Enter your height (cm): "))
-        gender = input("Enter your gender (male/female): ").lower()
+        is_female = input("Enter your gender (male/female): ").lower() != 'male'  # Parse gender once
         activity_level = input("Enter your activity level (sedentary, light, moderate, active, very active): ").lower()
 
         # Calculate BMR and TDEE using inputted data
-        bmr = calculate_bmr(weight, height, age, gender)
+        bmr = calculate_bmr(weight, height, age, is_female)
         tdee = calculate_tdee(bmr, activity_level)
         macros = recommended_macros(tdee)  # Calculate recommended macros
 
@@ -130,8 +96,66 @@ def calculate_recommended_intake():
     except ValueError:
         print("Invalid input. Please enter valid numeric values.")  # Handle invalid input case
 
+# Look up a single food item over the shared USDA session
+def fetch_one(food, quantity):
+    from usda_client import SESSION, fetch_from_usda
+    return fetch_from_usda(SESSION, food, quantity)
+
+# Look up several (food, quantity) pairs concurrently; each call is independent and I/O-bound
+def fetch_many(pairs):
+    if not pairs:
+        return []
+    from concurrent.futures import ThreadPoolExecutor
+    from usda_client import MAX_CONNECTIONS, SESSION, fetch_from_usda
+    with ThreadPoolExecutor(max_workers=min(MAX_CONNECTIONS, len(pairs))) as executor:
+        return list(executor.map(lambda fq: fetch_from_usda(SESSION, *fq), pairs))
+
+# Function to display combined macros for several food items
+def print_combined_macros(macros_list, num_items):
+    combined_macros = combine_macros(macros_list)
+    print(f"\nCombined Macros for {num_items} food items:")
+    for key in combined_macros:
+        print(f"  {key.capitalize()}: {combined_macros[key]}g")
+
+# Function to read (food, quantity) pairs from a CSV file with one "food,quantity" per line
+def read_batch(path):
+    import csv
+    pairs = []
+    with open(path, newline='') as file:
+        for line_num, row in enumerate(csv.reader(file), start=1):
+            if not row:
+                continue  # Skip blank lines
+            try:
+                food, quantity_str = row
+                quantity = float(quantity_str)
+                if quantity <= 0:
+                    raise ValueError("Quantity must be a positive number.")
+            except ValueError as e:
+                print(f"Skipping line {line_num}: {e}")  # Handle malformed rows
+                continue
+            pairs.append((food, quantity))
+    return pairs
+
+# Function to parse command-line arguments
+def parse_args():
+    parser = argparse.ArgumentParser(description="Look up food macros using the USDA FoodData Central API.")
+    parser.add_argument("--batch", metavar="PATH", help="CSV file of food,quantity rows to combine without prompting")
+    return parser.parse_args()
+
 # Main function to run the app
 def main():
+    args = parse_args()
+    if args.batch:
+        # Batch mode: look up every row from the file and print the combined macros
+        import csv
+        try:
+            pairs = read_batch(args.batch)
+        except (OSError, UnicodeDecodeError, csv.Error) as e:
+            print(f"Error reading batch file: {e}")
+            return
+        print_combined_macros(fetch_many(pairs), len(pairs))
+        return
+
     results = []  # Initialize an empty list to store results
     
     while True:  # Loop indefinitely until the user decides to exit
@@ -152,7 +176,7 @@ def main():
                 continue  # Go back to the start of the loop
 
             # Fetch nutrition data for the specified food item
-            macros = fetch_from_usda(food, quantity)
+            macros = fetch_one(food, quantity)
             if macros:
                 # Display nutrition information
                 print(f"\nNutrition for {macros['food_description']} ({macros['quantity']}g):")
@@ -164,8 +188,8 @@ def main():
 
         # Option 2: Search for multiple food items
         elif choice == '2':
-            combined_macros = {key: 0 for key in ["carbs", "protein", "fat", "calories", "fiber", "quantity"]}
             num_items = int(input("How many food items would you like to search? "))
+            pairs = []  # Collect (food, quantity) pairs before hitting the API
             for _ in range(num_items):
                 food = input("Enter the food item: ")
                 quantity_str = input("Enter the quantity (in grams): ")
@@ -178,14 +202,9 @@ def main():
                     print(f"Invalid quantity input: {e}")
                     continue
 
-                macros = fetch_from_usda(food, quantity)
-                if macros:
-                    for key in combined_macros:
-                        combined_macros[key] += macros[key]
+                pairs.append((food, quantity))
 
-            print(f"\nCombined Macros for {num_items} food items:")
-            for key in combined_macros:
-                print(f"  {key.capitalize()}: {combined_macros[key]}g")
+            print_combined_macros(fetch_many(pairs), num_items)
 
         elif choice == '3':
             if results:
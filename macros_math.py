@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+# Activity multipliers used to turn BMR into TDEE
+ACTIVITY_FACTORS: dict[str, float] = {
+    'sedentary': 1.2,
+    'light': 1.375,
+    'moderate': 1.55,
+    'active': 1.725,
+    'very active': 1.9
+}
+
+# Macronutrient ratio ranges and calories per gram of each nutrient
+MACRO_RATIOS: tuple[tuple[str, tuple[int, int]], ...] = (
+    ("carbs", (45, 65)),
+    ("protein", (10, 35)),
+    ("fat", (20, 35))
+)
+MACRO_DIVISORS: dict[str, int] = {"carbs": 4, "protein": 4, "fat": 9}
+
+# Function to calculate Basal Metabolic Rate (BMR)
+def calculate_bmr(weight: float, height: float, age: int, is_female: bool) -> float:
+    # BMR calculation formula; the sex offset is +5 for men and -161 for women
+    return 10.0 * weight + 6.25 * height - 5.0 * age + 5.0 - 166.0 * is_female
+
+# Function to calculate Total Daily Energy Expenditure (TDEE) based on activity level
+def calculate_tdee(bmr: float, activity_level: str) -> float:
+    return bmr * ACTIVITY_FACTORS.get(activity_level, 1.2)  # Return TDEE based on activity level
+
+# Function to calculate recommended macronutrient distribution based on TDEE
+def recommended_macros(tdee: float) -> dict[str, list[float]]:
+    # Calculate recommended ranges for each nutrient
+    return {nutrient: [tdee * percent / MACRO_DIVISORS[nutrient] for percent in ratio] for nutrient, ratio in MACRO_RATIOS}
@@ -0,0 +1,162 @@
+import os
+import dbm
+import functools
+import json
+import pickle
+import shelve
+import threading
+import time
+import requests
+try:
+    import orjson  # Faster JSON decoding when available
+except ImportError:
+    orjson = None
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+USDA_SEARCH_URL = "https://api.nal.usda.gov/fdc/v1/foods/search"
+# Nutrient fields reported per food, with their matching USDA nutrient IDs
+NUTRIENT_FIELDS = ("carbs", "protein", "fat", "calories", "fiber")
+NUTRIENT_FIELD_IDS = (1005, 1003, 1004, 1008, 1079)
+NUTRIENT_INDEX = {nutrient_id: index for index, nutrient_id in enumerate(NUTRIENT_FIELD_IDS)}
+# Persistent cache of USDA search results, kept next to this module
+USDA_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".usda_cache")
+CACHE_VERSION = 3  # Bump when the cached entry layout changes
+CACHE_TTL = 7 * 24 * 60 * 60  # Seconds before a cached entry is revalidated with the API
+CACHE_LOCK = threading.Lock()  # shelve is not safe for concurrent access
+# Errors from an unusable cache file; lookups fall back to the network instead.
+# dbm.dumb reports a corrupt index as ValueError/SyntaxError, truncated pickles raise EOFError.
+CACHE_ERRORS = (OSError, pickle.UnpicklingError, EOFError, ValueError, SyntaxError, *dbm.error)
+
+_API_KEY = None
+
+# Load the API key from the environment (and .env file) on first use
+def _api_key():
+    global _API_KEY
+    if _API_KEY is None:
+        from dotenv import load_dotenv
+        load_dotenv()  # Load API key from .env file
+        _API_KEY = os.getenv('API_KEY')  # Get the API key from the environment variables
+    return _API_KEY
+
+# Shared HTTP session so repeated lookups reuse the keep-alive connection.
+# Concurrent lookups should not exceed MAX_CONNECTIONS, so each one gets a pooled connection.
+MAX_CONNECTIONS = 8
+SESSION = requests.Session()
+SESSION.mount("https://", HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=MAX_CONNECTIONS,
+    max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504])
+))
+
+# Search the USDA API and return ((per-100g values, description), etag) for the first match.
+# When a cached (nutrients, etag) pair is given, the request is conditional and the
+# cached pair is returned as-is if the API answers 304 Not Modified.
+def _search_usda_remote(session, food, cached=None):
+    # Query parameters for the search (requests handles the URL quoting).
+    # Only the first match is used, so ask for a single result.
+    params = {"query": food, "api_key": _api_key(), "pageSize": 1, "dataType": "Foundation,SR Legacy"}
+    headers = {"If-None-Match": cached[1]} if cached and cached[1] else None
+    # Make a GET request to the USDA API over the shared session
+    response = session.get(USDA_SEARCH_URL, params=params, headers=headers, timeout=(3.05, 10))
+    if response.status_code == 304:
+        return cached  # Unchanged since the last fetch; skip download and decoding
+    # Raise an error if the request was unsuccessful
+    response.raise_for_status()
+    etag = response.headers.get("ETag")
+    # Convert the response to JSON format
+    try:
+        data = orjson.loads(response.content) if orjson else json.loads(response.content)
+    except json.JSONDecodeError as e:  # orjson.JSONDecodeError subclasses it
+        # Re-raise as a RequestException, as response.json() would, so callers handle it
+        raise requests.exceptions.JSONDecodeError(e.msg, e.doc, e.pos) from e
+
+    # Check if any food items were found
+    if not data.get('foods'):
+        return None, etag
+    food_data = data['foods'][0]  # Get the first food item found
+    values = parse_nutrients(food_data.get('foodNutrients', ()))
+    return (values, food_data.get('description', 'N/A')), etag  # Get food description or default to 'N/A'
+
+# Extract per-100g values in NUTRIENT_FIELDS order, stopping once all have been found
+def parse_nutrients(food_nutrients):
+    values = [0] * len(NUTRIENT_FIELD_IDS)
+    found = set()  # Slots filled so far; a repeated ID must not count twice
+    for nutrient in food_nutrients:
+        index = NUTRIENT_INDEX.get(nutrient['nutrientId'])
+        if index is not None:
+            values[index] = nutrient['value']
+            found.add(index)
+            if len(found) == len(NUTRIENT_FIELD_IDS):
+                break
+    return tuple(values)
+
+# Read an entry from the persistent cache, treating an unusable cache as a miss
+def _cache_get(key):
+    try:
+        with CACHE_LOCK, shelve.open(USDA_CACHE_PATH) as cache:
+            return cache.get(key)
+    except CACHE_ERRORS:
+        return None
+
+# Write an entry to the persistent cache, skipping it if the cache is unusable
+def _cache_put(key, entry):
+    try:
+        with CACHE_LOCK, shelve.open(USDA_CACHE_PATH) as cache:
+            cache[key] = entry
+    except CACHE_ERRORS:
+        pass
+
+# Remove an entry from the persistent cache, skipping it if the cache is unusable
+def _cache_delete(key):
+    try:
+        with CACHE_LOCK, shelve.open(USDA_CACHE_PATH) as cache:
+            cache.pop(key, None)
+    except CACHE_ERRORS:
+        pass
+
+# Cached USDA search: in-process LRU in front of a persistent shelve file.
+# Disk entries are (nutrients, etag, fetched_at) and are revalidated once stale.
+@functools.lru_cache(maxsize=1024)
+def _search_usda(session, food):
+    key = f"v{CACHE_VERSION}:{food}"
+    entry = _cache_get(key)
+    if entry and time.time() - entry[2] < CACHE_TTL:
+        return entry[0]
+
+    try:
+        nutrients, etag = _search_usda_remote(session, food, entry[:2] if entry else None)
+    except requests.RequestException:
+        if entry:
+            return entry[0]  # Revalidation failed; the stale entry is still usable
+        raise
+    if nutrients is not None:
+        _cache_put(key, (nutrients, etag, time.time()))
+    elif entry:
+        # The API no longer returns a match, so the stale entry is deleted rather than
+        # refreshed; later lookups then see a plain miss instead of revalidating it again
+        _cache_delete(key)
+    return nutrients
+
+# Scale per-100g nutrients to the requested quantity
+def scale(nutrients, quantity):
+    values, description = nutrients
+    factor = 0.01 * quantity  # Per-100g values to the requested grams
+    macros = dict(zip(NUTRIENT_FIELDS, [value * factor for value in values]))
+    macros["quantity"] = quantity
+    macros["food_description"] = description
+    return macros
+
+# Function to fetch nutrition data from USDA API
+def fetch_from_usda(session, food, quantity):
+    try:
+        # Cache key is the normalized food string
+        nutrients = _search_usda(session, food.strip().lower())
+        if nutrients:
+            # Return calculated nutrition values based on the requested quantity
+            return scale(nutrients, quantity)
+        print("No foods found in the USDA database.")  # Inform user if no food was found
+    except requests.RequestException as e:
+        print(f"Error fetching data: {e}")  # Print error message if there's an issue with the request
+
+    return None  # Return None if there was an error or no food was found